@@ -7,8 +7,10 @@ package dimse
 // http://dicom.nema.org/medical/dicom/current/output/pdf/part07.pdf
 
 import (
+	"bytes"
 	"encoding/binary"
 	"fmt"
+	"reflect"
 	"sync/atomic"
 
 	"github.com/yasushi-saito/go-dicom"
@@ -127,6 +129,63 @@ func (d *messageDecoder) getUInt16(tag dicom.Tag, optional isOptionalElement) ui
 	return v
 }
 
+// fieldKind is the Go type of a DIMSE message field.
+type fieldKind int
+
+const (
+	fieldKindString fieldKind = iota
+	fieldKindUInt16
+	fieldKindUInt32
+	fieldKindStatus
+)
+
+// fieldSpec describes one field of a DIMSE message struct. The generated
+// schemaXXX tables list a message's fields in struct order.
+type fieldSpec struct {
+	name     string
+	tag      dicom.Tag
+	kind     fieldKind
+	optional isOptionalElement
+}
+
+// Fill the message struct pointed to by "v" from the elements in "d". The
+// struct's fields must match "schema" one to one, followed by the Extra field,
+// which receives the elements not claimed by any of them.
+func decodeMessage(d *messageDecoder, v Message, schema []fieldSpec) {
+	rv := reflect.ValueOf(v).Elem()
+	for i, f := range schema {
+		field := rv.Field(i)
+		switch f.kind {
+		case fieldKindString:
+			field.SetString(d.getString(f.tag, f.optional))
+		case fieldKindUInt16:
+			field.SetUint(uint64(d.getUInt16(f.tag, f.optional)))
+		case fieldKindUInt32:
+			field.SetUint(uint64(d.getUInt32(f.tag, f.optional)))
+		case fieldKindStatus:
+			field.Set(reflect.ValueOf(d.getStatus()))
+		}
+	}
+	rv.Field(len(schema)).Set(reflect.ValueOf(d.unparsedElements()))
+}
+
+// Produce a human-readable description of message "v", for debugging. "v" and
+// "schema" are as for decodeMessage.
+func formatMessage(name string, v Message, schema []fieldSpec) string {
+	rv := reflect.ValueOf(v).Elem()
+	buf := bytes.Buffer{}
+	buf.WriteString(name)
+	buf.WriteByte('{')
+	for i, f := range schema {
+		if i > 0 {
+			buf.WriteByte(' ')
+		}
+		fmt.Fprintf(&buf, "%s:%v", f.name, rv.Field(i).Interface())
+	}
+	buf.WriteByte('}')
+	return buf.String()
+}
+
 // Encode a DIMSE field with the given tag, given value "v"
 func encodeField(e *dicomio.Encoder, tag dicom.Tag, v interface{}) {
 	elem := dicom.Element{
@@ -138,6 +197,24 @@ func encodeField(e *dicomio.Encoder, tag dicom.Tag, v interface{}) {
 	dicom.WriteElement(e, &elem)
 }
 
+// Encode a uint16 DIMSE field. Same as encodeField(e, tag, v), but writes the
+// implicit-VR element directly instead of boxing "v" and looking up its VR.
+// DIMSE commands are always implicit VR; see EncodeMessage.
+func encodeUInt16Field(e *dicomio.Encoder, tag dicom.Tag, v uint16) {
+	e.WriteUInt16(tag.Group)
+	e.WriteUInt16(tag.Element)
+	e.WriteUInt32(2)
+	e.WriteUInt16(v)
+}
+
+// Encode a uint32 DIMSE field. See encodeUInt16Field.
+func encodeUInt32Field(e *dicomio.Encoder, tag dicom.Tag, v uint32) {
+	e.WriteUInt16(tag.Group)
+	e.WriteUInt16(tag.Element)
+	e.WriteUInt32(4)
+	e.WriteUInt32(v)
+}
+
 // CommandDataSetTypeNull for dicom.TagCommandDataSetType indicates that the
 // DIMSE message has no data payload. Any other value indicates the existence of
 // a payload.
@@ -175,7 +252,7 @@ const (
 )
 
 func encodeStatus(e *dicomio.Encoder, s Status) {
-	encodeField(e, dicom.TagStatus, uint16(s.Status))
+	encodeUInt16Field(e, dicom.TagStatus, uint16(s.Status))
 	if s.ErrorComment != "" {
 		encodeField(e, dicom.TagErrorComment, s.ErrorComment)
 	}
@@ -218,20 +295,29 @@ func ReadMessage(d *dicomio.Decoder) Message {
 	return v
 }
 
+// encodedSizeHinter is implemented by the generated message types. The hint is
+// the expected size of the message's encoded fields, excluding Extra.
+type encodedSizeHinter interface {
+	encodedSizeHint() int
+}
+
 // EncodeMessage serializes the given message. Errors are reported through e.Error()
 func EncodeMessage(e *dicomio.Encoder, v Message) {
 	// DIMSE messages are always encoded Implicit+LE. See P3.7 6.3.1.
-	subEncoder := dicomio.NewBytesEncoder(binary.LittleEndian, dicomio.ImplicitVR)
+	buf := &bytes.Buffer{}
+	if h, ok := v.(encodedSizeHinter); ok {
+		buf.Grow(h.encodedSizeHint())
+	}
+	subEncoder := dicomio.NewEncoder(buf, binary.LittleEndian, dicomio.ImplicitVR)
 	v.Encode(subEncoder)
 	if err := subEncoder.Error(); err != nil {
 		e.SetError(err)
 		return
 	}
-	bytes := subEncoder.Bytes()
 	e.PushTransferSyntax(binary.LittleEndian, dicomio.ImplicitVR)
 	defer e.PopTransferSyntax()
-	encodeField(e, dicom.TagCommandGroupLength, uint32(len(bytes)))
-	e.WriteBytes(bytes)
+	encodeUInt32Field(e, dicom.TagCommandGroupLength, uint32(buf.Len()))
+	e.WriteBytes(buf.Bytes())
 }
 
 // CommandAssembler is a helper that assembles a DIMSE command message and data
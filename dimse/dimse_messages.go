@@ -1,12 +1,13 @@
+// hash: 808d38f875791ff6
 
 // Auto-generated from generate_dimse_messages.py. DO NOT EDIT.
 package dimse
 import (
 	"github.com/yasushi-saito/go-dicom"
 	"github.com/yasushi-saito/go-dicom/dicomio"
-        "fmt"
+	"fmt"
 )
-        
+
 type C_STORE_RQ struct  {
 	AffectedSOPClassUID string
 	MessageID uint16
@@ -19,17 +20,17 @@ type C_STORE_RQ struct  {
 }
 
 func (v* C_STORE_RQ) Encode(e *dicomio.Encoder) {
-	encodeField(e, dicom.TagCommandField, uint16(1))
+	encodeUInt16Field(e, dicom.TagCommandField, 1)
 	encodeField(e, dicom.TagAffectedSOPClassUID, v.AffectedSOPClassUID)
-	encodeField(e, dicom.TagMessageID, v.MessageID)
-	encodeField(e, dicom.TagPriority, v.Priority)
-	encodeField(e, dicom.TagCommandDataSetType, v.CommandDataSetType)
+	encodeUInt16Field(e, dicom.TagMessageID, v.MessageID)
+	encodeUInt16Field(e, dicom.TagPriority, v.Priority)
+	encodeUInt16Field(e, dicom.TagCommandDataSetType, v.CommandDataSetType)
 	encodeField(e, dicom.TagAffectedSOPInstanceUID, v.AffectedSOPInstanceUID)
 	if v.MoveOriginatorApplicationEntityTitle != "" {
 		encodeField(e, dicom.TagMoveOriginatorApplicationEntityTitle, v.MoveOriginatorApplicationEntityTitle)
 	}
 	if v.MoveOriginatorMessageID != 0 {
-		encodeField(e, dicom.TagMoveOriginatorMessageID, v.MoveOriginatorMessageID)
+		encodeUInt16Field(e, dicom.TagMoveOriginatorMessageID, v.MoveOriginatorMessageID)
 	}
 	for _, elem := range v.Extra {
 		dicom.WriteElement(e, elem)
@@ -48,20 +49,27 @@ func (v* C_STORE_RQ) GetMessageID() uint16 {
 	return v.MessageID
 }
 
+func (v* C_STORE_RQ) encodedSizeHint() int {
+	return 266
+}
+
+var schemaC_STORE_RQ = []fieldSpec{
+	{"AffectedSOPClassUID", dicom.TagAffectedSOPClassUID, fieldKindString, RequiredElement},
+	{"MessageID", dicom.TagMessageID, fieldKindUInt16, RequiredElement},
+	{"Priority", dicom.TagPriority, fieldKindUInt16, RequiredElement},
+	{"CommandDataSetType", dicom.TagCommandDataSetType, fieldKindUInt16, RequiredElement},
+	{"AffectedSOPInstanceUID", dicom.TagAffectedSOPInstanceUID, fieldKindString, RequiredElement},
+	{"MoveOriginatorApplicationEntityTitle", dicom.TagMoveOriginatorApplicationEntityTitle, fieldKindString, OptionalElement},
+	{"MoveOriginatorMessageID", dicom.TagMoveOriginatorMessageID, fieldKindUInt16, OptionalElement},
+}
+
 func (v* C_STORE_RQ) String() string {
-	return fmt.Sprintf("C_STORE_RQ{AffectedSOPClassUID:%v MessageID:%v Priority:%v CommandDataSetType:%v AffectedSOPInstanceUID:%v MoveOriginatorApplicationEntityTitle:%v MoveOriginatorMessageID:%v}}", v.AffectedSOPClassUID, v.MessageID, v.Priority, v.CommandDataSetType, v.AffectedSOPInstanceUID, v.MoveOriginatorApplicationEntityTitle, v.MoveOriginatorMessageID)
+	return formatMessage("C_STORE_RQ", v, schemaC_STORE_RQ)
 }
 
 func decodeC_STORE_RQ(d *messageDecoder) *C_STORE_RQ {
 	v := &C_STORE_RQ{}
-	v.AffectedSOPClassUID = d.getString(dicom.TagAffectedSOPClassUID, RequiredElement)
-	v.MessageID = d.getUInt16(dicom.TagMessageID, RequiredElement)
-	v.Priority = d.getUInt16(dicom.TagPriority, RequiredElement)
-	v.CommandDataSetType = d.getUInt16(dicom.TagCommandDataSetType, RequiredElement)
-	v.AffectedSOPInstanceUID = d.getString(dicom.TagAffectedSOPInstanceUID, RequiredElement)
-	v.MoveOriginatorApplicationEntityTitle = d.getString(dicom.TagMoveOriginatorApplicationEntityTitle, OptionalElement)
-	v.MoveOriginatorMessageID = d.getUInt16(dicom.TagMoveOriginatorMessageID, OptionalElement)
-	v.Extra = d.unparsedElements()
+	decodeMessage(d, v, schemaC_STORE_RQ)
 	return v
 }
 type C_STORE_RSP struct  {
@@ -74,10 +82,10 @@ type C_STORE_RSP struct  {
 }
 
 func (v* C_STORE_RSP) Encode(e *dicomio.Encoder) {
-	encodeField(e, dicom.TagCommandField, uint16(32769))
+	encodeUInt16Field(e, dicom.TagCommandField, 32769)
 	encodeField(e, dicom.TagAffectedSOPClassUID, v.AffectedSOPClassUID)
-	encodeField(e, dicom.TagMessageIDBeingRespondedTo, v.MessageIDBeingRespondedTo)
-	encodeField(e, dicom.TagCommandDataSetType, v.CommandDataSetType)
+	encodeUInt16Field(e, dicom.TagMessageIDBeingRespondedTo, v.MessageIDBeingRespondedTo)
+	encodeUInt16Field(e, dicom.TagCommandDataSetType, v.CommandDataSetType)
 	encodeField(e, dicom.TagAffectedSOPInstanceUID, v.AffectedSOPInstanceUID)
 	encodeStatus(e, v.Status)
 	for _, elem := range v.Extra {
@@ -97,18 +105,25 @@ func (v* C_STORE_RSP) GetMessageID() uint16 {
 	return v.MessageIDBeingRespondedTo
 }
 
+func (v* C_STORE_RSP) encodedSizeHint() int {
+	return 184
+}
+
+var schemaC_STORE_RSP = []fieldSpec{
+	{"AffectedSOPClassUID", dicom.TagAffectedSOPClassUID, fieldKindString, RequiredElement},
+	{"MessageIDBeingRespondedTo", dicom.TagMessageIDBeingRespondedTo, fieldKindUInt16, RequiredElement},
+	{"CommandDataSetType", dicom.TagCommandDataSetType, fieldKindUInt16, RequiredElement},
+	{"AffectedSOPInstanceUID", dicom.TagAffectedSOPInstanceUID, fieldKindString, RequiredElement},
+	{"Status", dicom.TagStatus, fieldKindStatus, RequiredElement},
+}
+
 func (v* C_STORE_RSP) String() string {
-	return fmt.Sprintf("C_STORE_RSP{AffectedSOPClassUID:%v MessageIDBeingRespondedTo:%v CommandDataSetType:%v AffectedSOPInstanceUID:%v Status:%v}}", v.AffectedSOPClassUID, v.MessageIDBeingRespondedTo, v.CommandDataSetType, v.AffectedSOPInstanceUID, v.Status)
+	return formatMessage("C_STORE_RSP", v, schemaC_STORE_RSP)
 }
 
 func decodeC_STORE_RSP(d *messageDecoder) *C_STORE_RSP {
 	v := &C_STORE_RSP{}
-	v.AffectedSOPClassUID = d.getString(dicom.TagAffectedSOPClassUID, RequiredElement)
-	v.MessageIDBeingRespondedTo = d.getUInt16(dicom.TagMessageIDBeingRespondedTo, RequiredElement)
-	v.CommandDataSetType = d.getUInt16(dicom.TagCommandDataSetType, RequiredElement)
-	v.AffectedSOPInstanceUID = d.getString(dicom.TagAffectedSOPInstanceUID, RequiredElement)
-	v.Status = d.getStatus()
-	v.Extra = d.unparsedElements()
+	decodeMessage(d, v, schemaC_STORE_RSP)
 	return v
 }
 type C_FIND_RQ struct  {
@@ -120,11 +135,11 @@ type C_FIND_RQ struct  {
 }
 
 func (v* C_FIND_RQ) Encode(e *dicomio.Encoder) {
-	encodeField(e, dicom.TagCommandField, uint16(32))
+	encodeUInt16Field(e, dicom.TagCommandField, 32)
 	encodeField(e, dicom.TagAffectedSOPClassUID, v.AffectedSOPClassUID)
-	encodeField(e, dicom.TagMessageID, v.MessageID)
-	encodeField(e, dicom.TagPriority, v.Priority)
-	encodeField(e, dicom.TagCommandDataSetType, v.CommandDataSetType)
+	encodeUInt16Field(e, dicom.TagMessageID, v.MessageID)
+	encodeUInt16Field(e, dicom.TagPriority, v.Priority)
+	encodeUInt16Field(e, dicom.TagCommandDataSetType, v.CommandDataSetType)
 	for _, elem := range v.Extra {
 		dicom.WriteElement(e, elem)
 	}
@@ -142,17 +157,24 @@ func (v* C_FIND_RQ) GetMessageID() uint16 {
 	return v.MessageID
 }
 
+func (v* C_FIND_RQ) encodedSizeHint() int {
+	return 112
+}
+
+var schemaC_FIND_RQ = []fieldSpec{
+	{"AffectedSOPClassUID", dicom.TagAffectedSOPClassUID, fieldKindString, RequiredElement},
+	{"MessageID", dicom.TagMessageID, fieldKindUInt16, RequiredElement},
+	{"Priority", dicom.TagPriority, fieldKindUInt16, RequiredElement},
+	{"CommandDataSetType", dicom.TagCommandDataSetType, fieldKindUInt16, RequiredElement},
+}
+
 func (v* C_FIND_RQ) String() string {
-	return fmt.Sprintf("C_FIND_RQ{AffectedSOPClassUID:%v MessageID:%v Priority:%v CommandDataSetType:%v}}", v.AffectedSOPClassUID, v.MessageID, v.Priority, v.CommandDataSetType)
+	return formatMessage("C_FIND_RQ", v, schemaC_FIND_RQ)
 }
 
 func decodeC_FIND_RQ(d *messageDecoder) *C_FIND_RQ {
 	v := &C_FIND_RQ{}
-	v.AffectedSOPClassUID = d.getString(dicom.TagAffectedSOPClassUID, RequiredElement)
-	v.MessageID = d.getUInt16(dicom.TagMessageID, RequiredElement)
-	v.Priority = d.getUInt16(dicom.TagPriority, RequiredElement)
-	v.CommandDataSetType = d.getUInt16(dicom.TagCommandDataSetType, RequiredElement)
-	v.Extra = d.unparsedElements()
+	decodeMessage(d, v, schemaC_FIND_RQ)
 	return v
 }
 type C_FIND_RSP struct  {
@@ -164,10 +186,10 @@ type C_FIND_RSP struct  {
 }
 
 func (v* C_FIND_RSP) Encode(e *dicomio.Encoder) {
-	encodeField(e, dicom.TagCommandField, uint16(32800))
+	encodeUInt16Field(e, dicom.TagCommandField, 32800)
 	encodeField(e, dicom.TagAffectedSOPClassUID, v.AffectedSOPClassUID)
-	encodeField(e, dicom.TagMessageIDBeingRespondedTo, v.MessageIDBeingRespondedTo)
-	encodeField(e, dicom.TagCommandDataSetType, v.CommandDataSetType)
+	encodeUInt16Field(e, dicom.TagMessageIDBeingRespondedTo, v.MessageIDBeingRespondedTo)
+	encodeUInt16Field(e, dicom.TagCommandDataSetType, v.CommandDataSetType)
 	encodeStatus(e, v.Status)
 	for _, elem := range v.Extra {
 		dicom.WriteElement(e, elem)
@@ -186,17 +208,24 @@ func (v* C_FIND_RSP) GetMessageID() uint16 {
 	return v.MessageIDBeingRespondedTo
 }
 
+func (v* C_FIND_RSP) encodedSizeHint() int {
+	return 112
+}
+
+var schemaC_FIND_RSP = []fieldSpec{
+	{"AffectedSOPClassUID", dicom.TagAffectedSOPClassUID, fieldKindString, RequiredElement},
+	{"MessageIDBeingRespondedTo", dicom.TagMessageIDBeingRespondedTo, fieldKindUInt16, RequiredElement},
+	{"CommandDataSetType", dicom.TagCommandDataSetType, fieldKindUInt16, RequiredElement},
+	{"Status", dicom.TagStatus, fieldKindStatus, RequiredElement},
+}
+
 func (v* C_FIND_RSP) String() string {
-	return fmt.Sprintf("C_FIND_RSP{AffectedSOPClassUID:%v MessageIDBeingRespondedTo:%v CommandDataSetType:%v Status:%v}}", v.AffectedSOPClassUID, v.MessageIDBeingRespondedTo, v.CommandDataSetType, v.Status)
+	return formatMessage("C_FIND_RSP", v, schemaC_FIND_RSP)
 }
 
 func decodeC_FIND_RSP(d *messageDecoder) *C_FIND_RSP {
 	v := &C_FIND_RSP{}
-	v.AffectedSOPClassUID = d.getString(dicom.TagAffectedSOPClassUID, RequiredElement)
-	v.MessageIDBeingRespondedTo = d.getUInt16(dicom.TagMessageIDBeingRespondedTo, RequiredElement)
-	v.CommandDataSetType = d.getUInt16(dicom.TagCommandDataSetType, RequiredElement)
-	v.Status = d.getStatus()
-	v.Extra = d.unparsedElements()
+	decodeMessage(d, v, schemaC_FIND_RSP)
 	return v
 }
 type C_GET_RQ struct  {
@@ -208,11 +237,11 @@ type C_GET_RQ struct  {
 }
 
 func (v* C_GET_RQ) Encode(e *dicomio.Encoder) {
-	encodeField(e, dicom.TagCommandField, uint16(16))
+	encodeUInt16Field(e, dicom.TagCommandField, 16)
 	encodeField(e, dicom.TagAffectedSOPClassUID, v.AffectedSOPClassUID)
-	encodeField(e, dicom.TagMessageID, v.MessageID)
-	encodeField(e, dicom.TagPriority, v.Priority)
-	encodeField(e, dicom.TagCommandDataSetType, v.CommandDataSetType)
+	encodeUInt16Field(e, dicom.TagMessageID, v.MessageID)
+	encodeUInt16Field(e, dicom.TagPriority, v.Priority)
+	encodeUInt16Field(e, dicom.TagCommandDataSetType, v.CommandDataSetType)
 	for _, elem := range v.Extra {
 		dicom.WriteElement(e, elem)
 	}
@@ -230,17 +259,24 @@ func (v* C_GET_RQ) GetMessageID() uint16 {
 	return v.MessageID
 }
 
+func (v* C_GET_RQ) encodedSizeHint() int {
+	return 112
+}
+
+var schemaC_GET_RQ = []fieldSpec{
+	{"AffectedSOPClassUID", dicom.TagAffectedSOPClassUID, fieldKindString, RequiredElement},
+	{"MessageID", dicom.TagMessageID, fieldKindUInt16, RequiredElement},
+	{"Priority", dicom.TagPriority, fieldKindUInt16, RequiredElement},
+	{"CommandDataSetType", dicom.TagCommandDataSetType, fieldKindUInt16, RequiredElement},
+}
+
 func (v* C_GET_RQ) String() string {
-	return fmt.Sprintf("C_GET_RQ{AffectedSOPClassUID:%v MessageID:%v Priority:%v CommandDataSetType:%v}}", v.AffectedSOPClassUID, v.MessageID, v.Priority, v.CommandDataSetType)
+	return formatMessage("C_GET_RQ", v, schemaC_GET_RQ)
 }
 
 func decodeC_GET_RQ(d *messageDecoder) *C_GET_RQ {
 	v := &C_GET_RQ{}
-	v.AffectedSOPClassUID = d.getString(dicom.TagAffectedSOPClassUID, RequiredElement)
-	v.MessageID = d.getUInt16(dicom.TagMessageID, RequiredElement)
-	v.Priority = d.getUInt16(dicom.TagPriority, RequiredElement)
-	v.CommandDataSetType = d.getUInt16(dicom.TagCommandDataSetType, RequiredElement)
-	v.Extra = d.unparsedElements()
+	decodeMessage(d, v, schemaC_GET_RQ)
 	return v
 }
 type C_GET_RSP struct  {
@@ -256,21 +292,21 @@ type C_GET_RSP struct  {
 }
 
 func (v* C_GET_RSP) Encode(e *dicomio.Encoder) {
-	encodeField(e, dicom.TagCommandField, uint16(32784))
+	encodeUInt16Field(e, dicom.TagCommandField, 32784)
 	encodeField(e, dicom.TagAffectedSOPClassUID, v.AffectedSOPClassUID)
-	encodeField(e, dicom.TagMessageIDBeingRespondedTo, v.MessageIDBeingRespondedTo)
-	encodeField(e, dicom.TagCommandDataSetType, v.CommandDataSetType)
+	encodeUInt16Field(e, dicom.TagMessageIDBeingRespondedTo, v.MessageIDBeingRespondedTo)
+	encodeUInt16Field(e, dicom.TagCommandDataSetType, v.CommandDataSetType)
 	if v.NumberOfRemainingSuboperations != 0 {
-		encodeField(e, dicom.TagNumberOfRemainingSuboperations, v.NumberOfRemainingSuboperations)
+		encodeUInt16Field(e, dicom.TagNumberOfRemainingSuboperations, v.NumberOfRemainingSuboperations)
 	}
 	if v.NumberOfCompletedSuboperations != 0 {
-		encodeField(e, dicom.TagNumberOfCompletedSuboperations, v.NumberOfCompletedSuboperations)
+		encodeUInt16Field(e, dicom.TagNumberOfCompletedSuboperations, v.NumberOfCompletedSuboperations)
 	}
 	if v.NumberOfFailedSuboperations != 0 {
-		encodeField(e, dicom.TagNumberOfFailedSuboperations, v.NumberOfFailedSuboperations)
+		encodeUInt16Field(e, dicom.TagNumberOfFailedSuboperations, v.NumberOfFailedSuboperations)
 	}
 	if v.NumberOfWarningSuboperations != 0 {
-		encodeField(e, dicom.TagNumberOfWarningSuboperations, v.NumberOfWarningSuboperations)
+		encodeUInt16Field(e, dicom.TagNumberOfWarningSuboperations, v.NumberOfWarningSuboperations)
 	}
 	encodeStatus(e, v.Status)
 	for _, elem := range v.Extra {
@@ -290,21 +326,28 @@ func (v* C_GET_RSP) GetMessageID() uint16 {
 	return v.MessageIDBeingRespondedTo
 }
 
+func (v* C_GET_RSP) encodedSizeHint() int {
+	return 152
+}
+
+var schemaC_GET_RSP = []fieldSpec{
+	{"AffectedSOPClassUID", dicom.TagAffectedSOPClassUID, fieldKindString, RequiredElement},
+	{"MessageIDBeingRespondedTo", dicom.TagMessageIDBeingRespondedTo, fieldKindUInt16, RequiredElement},
+	{"CommandDataSetType", dicom.TagCommandDataSetType, fieldKindUInt16, RequiredElement},
+	{"NumberOfRemainingSuboperations", dicom.TagNumberOfRemainingSuboperations, fieldKindUInt16, OptionalElement},
+	{"NumberOfCompletedSuboperations", dicom.TagNumberOfCompletedSuboperations, fieldKindUInt16, OptionalElement},
+	{"NumberOfFailedSuboperations", dicom.TagNumberOfFailedSuboperations, fieldKindUInt16, OptionalElement},
+	{"NumberOfWarningSuboperations", dicom.TagNumberOfWarningSuboperations, fieldKindUInt16, OptionalElement},
+	{"Status", dicom.TagStatus, fieldKindStatus, RequiredElement},
+}
+
 func (v* C_GET_RSP) String() string {
-	return fmt.Sprintf("C_GET_RSP{AffectedSOPClassUID:%v MessageIDBeingRespondedTo:%v CommandDataSetType:%v NumberOfRemainingSuboperations:%v NumberOfCompletedSuboperations:%v NumberOfFailedSuboperations:%v NumberOfWarningSuboperations:%v Status:%v}}", v.AffectedSOPClassUID, v.MessageIDBeingRespondedTo, v.CommandDataSetType, v.NumberOfRemainingSuboperations, v.NumberOfCompletedSuboperations, v.NumberOfFailedSuboperations, v.NumberOfWarningSuboperations, v.Status)
+	return formatMessage("C_GET_RSP", v, schemaC_GET_RSP)
 }
 
 func decodeC_GET_RSP(d *messageDecoder) *C_GET_RSP {
 	v := &C_GET_RSP{}
-	v.AffectedSOPClassUID = d.getString(dicom.TagAffectedSOPClassUID, RequiredElement)
-	v.MessageIDBeingRespondedTo = d.getUInt16(dicom.TagMessageIDBeingRespondedTo, RequiredElement)
-	v.CommandDataSetType = d.getUInt16(dicom.TagCommandDataSetType, RequiredElement)
-	v.NumberOfRemainingSuboperations = d.getUInt16(dicom.TagNumberOfRemainingSuboperations, OptionalElement)
-	v.NumberOfCompletedSuboperations = d.getUInt16(dicom.TagNumberOfCompletedSuboperations, OptionalElement)
-	v.NumberOfFailedSuboperations = d.getUInt16(dicom.TagNumberOfFailedSuboperations, OptionalElement)
-	v.NumberOfWarningSuboperations = d.getUInt16(dicom.TagNumberOfWarningSuboperations, OptionalElement)
-	v.Status = d.getStatus()
-	v.Extra = d.unparsedElements()
+	decodeMessage(d, v, schemaC_GET_RSP)
 	return v
 }
 type C_MOVE_RQ struct  {
@@ -317,12 +360,12 @@ type C_MOVE_RQ struct  {
 }
 
 func (v* C_MOVE_RQ) Encode(e *dicomio.Encoder) {
-	encodeField(e, dicom.TagCommandField, uint16(33))
+	encodeUInt16Field(e, dicom.TagCommandField, 33)
 	encodeField(e, dicom.TagAffectedSOPClassUID, v.AffectedSOPClassUID)
-	encodeField(e, dicom.TagMessageID, v.MessageID)
-	encodeField(e, dicom.TagPriority, v.Priority)
+	encodeUInt16Field(e, dicom.TagMessageID, v.MessageID)
+	encodeUInt16Field(e, dicom.TagPriority, v.Priority)
 	encodeField(e, dicom.TagMoveDestination, v.MoveDestination)
-	encodeField(e, dicom.TagCommandDataSetType, v.CommandDataSetType)
+	encodeUInt16Field(e, dicom.TagCommandDataSetType, v.CommandDataSetType)
 	for _, elem := range v.Extra {
 		dicom.WriteElement(e, elem)
 	}
@@ -340,18 +383,25 @@ func (v* C_MOVE_RQ) GetMessageID() uint16 {
 	return v.MessageID
 }
 
+func (v* C_MOVE_RQ) encodedSizeHint() int {
+	return 184
+}
+
+var schemaC_MOVE_RQ = []fieldSpec{
+	{"AffectedSOPClassUID", dicom.TagAffectedSOPClassUID, fieldKindString, RequiredElement},
+	{"MessageID", dicom.TagMessageID, fieldKindUInt16, RequiredElement},
+	{"Priority", dicom.TagPriority, fieldKindUInt16, RequiredElement},
+	{"MoveDestination", dicom.TagMoveDestination, fieldKindString, RequiredElement},
+	{"CommandDataSetType", dicom.TagCommandDataSetType, fieldKindUInt16, RequiredElement},
+}
+
 func (v* C_MOVE_RQ) String() string {
-	return fmt.Sprintf("C_MOVE_RQ{AffectedSOPClassUID:%v MessageID:%v Priority:%v MoveDestination:%v CommandDataSetType:%v}}", v.AffectedSOPClassUID, v.MessageID, v.Priority, v.MoveDestination, v.CommandDataSetType)
+	return formatMessage("C_MOVE_RQ", v, schemaC_MOVE_RQ)
 }
 
 func decodeC_MOVE_RQ(d *messageDecoder) *C_MOVE_RQ {
 	v := &C_MOVE_RQ{}
-	v.AffectedSOPClassUID = d.getString(dicom.TagAffectedSOPClassUID, RequiredElement)
-	v.MessageID = d.getUInt16(dicom.TagMessageID, RequiredElement)
-	v.Priority = d.getUInt16(dicom.TagPriority, RequiredElement)
-	v.MoveDestination = d.getString(dicom.TagMoveDestination, RequiredElement)
-	v.CommandDataSetType = d.getUInt16(dicom.TagCommandDataSetType, RequiredElement)
-	v.Extra = d.unparsedElements()
+	decodeMessage(d, v, schemaC_MOVE_RQ)
 	return v
 }
 type C_MOVE_RSP struct  {
@@ -367,21 +417,21 @@ type C_MOVE_RSP struct  {
 }
 
 func (v* C_MOVE_RSP) Encode(e *dicomio.Encoder) {
-	encodeField(e, dicom.TagCommandField, uint16(32801))
+	encodeUInt16Field(e, dicom.TagCommandField, 32801)
 	encodeField(e, dicom.TagAffectedSOPClassUID, v.AffectedSOPClassUID)
-	encodeField(e, dicom.TagMessageIDBeingRespondedTo, v.MessageIDBeingRespondedTo)
-	encodeField(e, dicom.TagCommandDataSetType, v.CommandDataSetType)
+	encodeUInt16Field(e, dicom.TagMessageIDBeingRespondedTo, v.MessageIDBeingRespondedTo)
+	encodeUInt16Field(e, dicom.TagCommandDataSetType, v.CommandDataSetType)
 	if v.NumberOfRemainingSuboperations != 0 {
-		encodeField(e, dicom.TagNumberOfRemainingSuboperations, v.NumberOfRemainingSuboperations)
+		encodeUInt16Field(e, dicom.TagNumberOfRemainingSuboperations, v.NumberOfRemainingSuboperations)
 	}
 	if v.NumberOfCompletedSuboperations != 0 {
-		encodeField(e, dicom.TagNumberOfCompletedSuboperations, v.NumberOfCompletedSuboperations)
+		encodeUInt16Field(e, dicom.TagNumberOfCompletedSuboperations, v.NumberOfCompletedSuboperations)
 	}
 	if v.NumberOfFailedSuboperations != 0 {
-		encodeField(e, dicom.TagNumberOfFailedSuboperations, v.NumberOfFailedSuboperations)
+		encodeUInt16Field(e, dicom.TagNumberOfFailedSuboperations, v.NumberOfFailedSuboperations)
 	}
 	if v.NumberOfWarningSuboperations != 0 {
-		encodeField(e, dicom.TagNumberOfWarningSuboperations, v.NumberOfWarningSuboperations)
+		encodeUInt16Field(e, dicom.TagNumberOfWarningSuboperations, v.NumberOfWarningSuboperations)
 	}
 	encodeStatus(e, v.Status)
 	for _, elem := range v.Extra {
@@ -401,21 +451,28 @@ func (v* C_MOVE_RSP) GetMessageID() uint16 {
 	return v.MessageIDBeingRespondedTo
 }
 
+func (v* C_MOVE_RSP) encodedSizeHint() int {
+	return 152
+}
+
+var schemaC_MOVE_RSP = []fieldSpec{
+	{"AffectedSOPClassUID", dicom.TagAffectedSOPClassUID, fieldKindString, RequiredElement},
+	{"MessageIDBeingRespondedTo", dicom.TagMessageIDBeingRespondedTo, fieldKindUInt16, RequiredElement},
+	{"CommandDataSetType", dicom.TagCommandDataSetType, fieldKindUInt16, RequiredElement},
+	{"NumberOfRemainingSuboperations", dicom.TagNumberOfRemainingSuboperations, fieldKindUInt16, OptionalElement},
+	{"NumberOfCompletedSuboperations", dicom.TagNumberOfCompletedSuboperations, fieldKindUInt16, OptionalElement},
+	{"NumberOfFailedSuboperations", dicom.TagNumberOfFailedSuboperations, fieldKindUInt16, OptionalElement},
+	{"NumberOfWarningSuboperations", dicom.TagNumberOfWarningSuboperations, fieldKindUInt16, OptionalElement},
+	{"Status", dicom.TagStatus, fieldKindStatus, RequiredElement},
+}
+
 func (v* C_MOVE_RSP) String() string {
-	return fmt.Sprintf("C_MOVE_RSP{AffectedSOPClassUID:%v MessageIDBeingRespondedTo:%v CommandDataSetType:%v NumberOfRemainingSuboperations:%v NumberOfCompletedSuboperations:%v NumberOfFailedSuboperations:%v NumberOfWarningSuboperations:%v Status:%v}}", v.AffectedSOPClassUID, v.MessageIDBeingRespondedTo, v.CommandDataSetType, v.NumberOfRemainingSuboperations, v.NumberOfCompletedSuboperations, v.NumberOfFailedSuboperations, v.NumberOfWarningSuboperations, v.Status)
+	return formatMessage("C_MOVE_RSP", v, schemaC_MOVE_RSP)
 }
 
 func decodeC_MOVE_RSP(d *messageDecoder) *C_MOVE_RSP {
 	v := &C_MOVE_RSP{}
-	v.AffectedSOPClassUID = d.getString(dicom.TagAffectedSOPClassUID, RequiredElement)
-	v.MessageIDBeingRespondedTo = d.getUInt16(dicom.TagMessageIDBeingRespondedTo, RequiredElement)
-	v.CommandDataSetType = d.getUInt16(dicom.TagCommandDataSetType, RequiredElement)
-	v.NumberOfRemainingSuboperations = d.getUInt16(dicom.TagNumberOfRemainingSuboperations, OptionalElement)
-	v.NumberOfCompletedSuboperations = d.getUInt16(dicom.TagNumberOfCompletedSuboperations, OptionalElement)
-	v.NumberOfFailedSuboperations = d.getUInt16(dicom.TagNumberOfFailedSuboperations, OptionalElement)
-	v.NumberOfWarningSuboperations = d.getUInt16(dicom.TagNumberOfWarningSuboperations, OptionalElement)
-	v.Status = d.getStatus()
-	v.Extra = d.unparsedElements()
+	decodeMessage(d, v, schemaC_MOVE_RSP)
 	return v
 }
 type C_ECHO_RQ struct  {
@@ -425,9 +482,9 @@ type C_ECHO_RQ struct  {
 }
 
 func (v* C_ECHO_RQ) Encode(e *dicomio.Encoder) {
-	encodeField(e, dicom.TagCommandField, uint16(48))
-	encodeField(e, dicom.TagMessageID, v.MessageID)
-	encodeField(e, dicom.TagCommandDataSetType, v.CommandDataSetType)
+	encodeUInt16Field(e, dicom.TagCommandField, 48)
+	encodeUInt16Field(e, dicom.TagMessageID, v.MessageID)
+	encodeUInt16Field(e, dicom.TagCommandDataSetType, v.CommandDataSetType)
 	for _, elem := range v.Extra {
 		dicom.WriteElement(e, elem)
 	}
@@ -445,15 +502,22 @@ func (v* C_ECHO_RQ) GetMessageID() uint16 {
 	return v.MessageID
 }
 
+func (v* C_ECHO_RQ) encodedSizeHint() int {
+	return 30
+}
+
+var schemaC_ECHO_RQ = []fieldSpec{
+	{"MessageID", dicom.TagMessageID, fieldKindUInt16, RequiredElement},
+	{"CommandDataSetType", dicom.TagCommandDataSetType, fieldKindUInt16, RequiredElement},
+}
+
 func (v* C_ECHO_RQ) String() string {
-	return fmt.Sprintf("C_ECHO_RQ{MessageID:%v CommandDataSetType:%v}}", v.MessageID, v.CommandDataSetType)
+	return formatMessage("C_ECHO_RQ", v, schemaC_ECHO_RQ)
 }
 
 func decodeC_ECHO_RQ(d *messageDecoder) *C_ECHO_RQ {
 	v := &C_ECHO_RQ{}
-	v.MessageID = d.getUInt16(dicom.TagMessageID, RequiredElement)
-	v.CommandDataSetType = d.getUInt16(dicom.TagCommandDataSetType, RequiredElement)
-	v.Extra = d.unparsedElements()
+	decodeMessage(d, v, schemaC_ECHO_RQ)
 	return v
 }
 type C_ECHO_RSP struct  {
@@ -464,9 +528,9 @@ type C_ECHO_RSP struct  {
 }
 
 func (v* C_ECHO_RSP) Encode(e *dicomio.Encoder) {
-	encodeField(e, dicom.TagCommandField, uint16(32816))
-	encodeField(e, dicom.TagMessageIDBeingRespondedTo, v.MessageIDBeingRespondedTo)
-	encodeField(e, dicom.TagCommandDataSetType, v.CommandDataSetType)
+	encodeUInt16Field(e, dicom.TagCommandField, 32816)
+	encodeUInt16Field(e, dicom.TagMessageIDBeingRespondedTo, v.MessageIDBeingRespondedTo)
+	encodeUInt16Field(e, dicom.TagCommandDataSetType, v.CommandDataSetType)
 	encodeStatus(e, v.Status)
 	for _, elem := range v.Extra {
 		dicom.WriteElement(e, elem)
@@ -485,16 +549,23 @@ func (v* C_ECHO_RSP) GetMessageID() uint16 {
 	return v.MessageIDBeingRespondedTo
 }
 
+func (v* C_ECHO_RSP) encodedSizeHint() int {
+	return 40
+}
+
+var schemaC_ECHO_RSP = []fieldSpec{
+	{"MessageIDBeingRespondedTo", dicom.TagMessageIDBeingRespondedTo, fieldKindUInt16, RequiredElement},
+	{"CommandDataSetType", dicom.TagCommandDataSetType, fieldKindUInt16, RequiredElement},
+	{"Status", dicom.TagStatus, fieldKindStatus, RequiredElement},
+}
+
 func (v* C_ECHO_RSP) String() string {
-	return fmt.Sprintf("C_ECHO_RSP{MessageIDBeingRespondedTo:%v CommandDataSetType:%v Status:%v}}", v.MessageIDBeingRespondedTo, v.CommandDataSetType, v.Status)
+	return formatMessage("C_ECHO_RSP", v, schemaC_ECHO_RSP)
 }
 
 func decodeC_ECHO_RSP(d *messageDecoder) *C_ECHO_RSP {
 	v := &C_ECHO_RSP{}
-	v.MessageIDBeingRespondedTo = d.getUInt16(dicom.TagMessageIDBeingRespondedTo, RequiredElement)
-	v.CommandDataSetType = d.getUInt16(dicom.TagCommandDataSetType, RequiredElement)
-	v.Status = d.getStatus()
-	v.Extra = d.unparsedElements()
+	decodeMessage(d, v, schemaC_ECHO_RSP)
 	return v
 }
 const CommandFieldC_STORE_RQ = 1
@@ -507,30 +578,36 @@ const CommandFieldC_MOVE_RQ = 33
 const CommandFieldC_MOVE_RSP = 32801
 const CommandFieldC_ECHO_RQ = 48
 const CommandFieldC_ECHO_RSP = 32816
+type messageDecoderEntry struct {
+	commandField uint16
+	decode       func(*messageDecoder) Message
+}
+
+// Indexed by commandFieldSlot(commandField).
+var messageDecoders = [64]messageDecoderEntry{
+	1: {0x1, func(d *messageDecoder) Message { return decodeC_STORE_RQ(d) }},
+	9: {0x8001, func(d *messageDecoder) Message { return decodeC_STORE_RSP(d) }},
+	16: {0x10, func(d *messageDecoder) Message { return decodeC_GET_RQ(d) }},
+	24: {0x8010, func(d *messageDecoder) Message { return decodeC_GET_RSP(d) }},
+	32: {0x20, func(d *messageDecoder) Message { return decodeC_FIND_RQ(d) }},
+	33: {0x21, func(d *messageDecoder) Message { return decodeC_MOVE_RQ(d) }},
+	40: {0x8020, func(d *messageDecoder) Message { return decodeC_FIND_RSP(d) }},
+	41: {0x8021, func(d *messageDecoder) Message { return decodeC_MOVE_RSP(d) }},
+	48: {0x30, func(d *messageDecoder) Message { return decodeC_ECHO_RQ(d) }},
+	56: {0x8030, func(d *messageDecoder) Message { return decodeC_ECHO_RSP(d) }},
+}
+
+// Perfect hash of the command fields of all message types, found by
+// generate_dimse_messages.py.
+func commandFieldSlot(commandField uint16) uint16 {
+	return (commandField ^ (commandField >> 12)) & 63
+}
+
 func decodeMessageForType(d* messageDecoder, commandField uint16) Message {
-	switch commandField {
-	case 0x1:
-		return decodeC_STORE_RQ(d)
-	case 0x8001:
-		return decodeC_STORE_RSP(d)
-	case 0x20:
-		return decodeC_FIND_RQ(d)
-	case 0x8020:
-		return decodeC_FIND_RSP(d)
-	case 0x10:
-		return decodeC_GET_RQ(d)
-	case 0x8010:
-		return decodeC_GET_RSP(d)
-	case 0x21:
-		return decodeC_MOVE_RQ(d)
-	case 0x8021:
-		return decodeC_MOVE_RSP(d)
-	case 0x30:
-		return decodeC_ECHO_RQ(d)
-	case 0x8030:
-		return decodeC_ECHO_RSP(d)
-	default:
+	entry := &messageDecoders[commandFieldSlot(commandField)]
+	if entry.decode == nil || entry.commandField != commandField {
 		d.setError(fmt.Errorf("Unknown DIMSE command 0x%x", commandField))
 		return nil
 	}
+	return entry.decode(d)
 }
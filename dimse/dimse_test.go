@@ -2,8 +2,10 @@ package dimse_test
 
 import (
 	"encoding/binary"
+	"github.com/yasushi-saito/go-dicom"
 	"github.com/yasushi-saito/go-dicom/dicomio"
 	"github.com/yasushi-saito/go-netdicom/dimse"
+	"strings"
 	"testing"
 )
 
@@ -52,3 +54,49 @@ func TestCEchoRsp(t *testing.T) {
 		dimse.Status{Status: dimse.StatusCode(0x2345)},
 		nil})
 }
+
+func TestAllCommands(t *testing.T) {
+	status := dimse.Status{Status: dimse.StatusPending}
+	for _, v := range []dimse.Message{
+		&dimse.C_FIND_RQ{AffectedSOPClassUID: "1.2.3", MessageID: 0x1234, Priority: 1, CommandDataSetType: 1},
+		&dimse.C_FIND_RSP{AffectedSOPClassUID: "1.2.3", MessageIDBeingRespondedTo: 0x1234, CommandDataSetType: 1, Status: status},
+		&dimse.C_GET_RQ{AffectedSOPClassUID: "1.2.3", MessageID: 0x1234, Priority: 1, CommandDataSetType: 1},
+		&dimse.C_GET_RSP{AffectedSOPClassUID: "1.2.3", MessageIDBeingRespondedTo: 0x1234, CommandDataSetType: 1,
+			NumberOfRemainingSuboperations: 3, NumberOfCompletedSuboperations: 2, Status: status},
+		&dimse.C_MOVE_RQ{AffectedSOPClassUID: "1.2.3", MessageID: 0x1234, Priority: 1, MoveDestination: "dest", CommandDataSetType: 1},
+		&dimse.C_MOVE_RSP{AffectedSOPClassUID: "1.2.3", MessageIDBeingRespondedTo: 0x1234, CommandDataSetType: 1,
+			NumberOfFailedSuboperations: 1, NumberOfWarningSuboperations: 4, Status: status},
+	} {
+		testDIMSE(t, v)
+	}
+}
+
+func TestUnknownCommand(t *testing.T) {
+	// 0x8009 hashes to C_STORE_RQ's slot in the decoder table; 0x0 hashes to
+	// an empty slot.
+	for _, commandField := range []uint16{0x8009, 0x0} {
+		e := dicomio.NewBytesEncoder(binary.LittleEndian, dicomio.ImplicitVR)
+		dicom.WriteElement(e, &dicom.Element{
+			Tag:   dicom.TagCommandField,
+			VR:    "US",
+			Value: []interface{}{commandField},
+		})
+		d := dicomio.NewBytesDecoder(e.Bytes(), binary.LittleEndian, dicomio.ImplicitVR)
+		if v := dimse.ReadMessage(d); v != nil {
+			t.Errorf("Command 0x%x: expect nil message, got %v", commandField, v)
+		}
+		if err := d.Finish(); err == nil || !strings.Contains(err.Error(), "Unknown DIMSE command") {
+			t.Errorf("Command 0x%x: expect unknown-command error, got %v", commandField, err)
+		}
+	}
+}
+
+func TestString(t *testing.T) {
+	v := &dimse.C_ECHO_RSP{0x1234, 1,
+		dimse.Status{Status: dimse.StatusCode(0x2345), ErrorComment: "foo"},
+		nil}
+	expected := "C_ECHO_RSP{MessageIDBeingRespondedTo:4660 CommandDataSetType:1 Status:{9029 foo}}"
+	if s := v.String(); s != expected {
+		t.Errorf("Expect %q, got %q", expected, s)
+	}
+}
@@ -1,214 +1,369 @@
 #!/usr/bin/env python3.6
 
 import enum
-from typing import IO, List, NamedTuple
+import functools
+import hashlib
+import os
+from typing import List, Tuple
+
+class Record:
+    """Base for immutable records stored in __slots__. Subclasses list their
+    attributes in __slots__ and assign them in __init__ via _set."""
+    __slots__ = ()
+
+    def _set(self, **values):
+        for name, value in values.items():
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f'{type(self).__name__} is immutable')
+
+    def __iter__(self):
+        return (getattr(self, name) for name in self.__slots__)
+
+    def __repr__(self):
+        args = ', '.join(repr(value) for value in self)
+        return f'{type(self).__name__}({args})'
+
+class Field(Record):
+    __slots__ = ('name', 'type', 'required')
+
+    def __init__(self, name: str, type: str, required: bool):
+        self._set(name=name, type=type, required=required)
 
-Field = NamedTuple('Field', [('name', str),
-                             ('type', str),
-                             ('required', bool)])
 class Type(enum.Enum):
     REQUEST = 1
     RESPONSE = 2
 
-Message = NamedTuple('Message',
-                     [('name', str),
-                      ('type', Type),
-                      ('command_field', int),
-                      ('fields', List[Field])])
+# Go field types. Message.types holds indexes into this tuple.
+TYPES = ('string', 'uint16', 'uint32', 'Status')
+TYPE_CODES = {typ: code for code, typ in enumerate(TYPES)}
+
+class Message(Record):
+    """Fields are stored column-wise: field i is named names[i], has Go type
+    TYPES[types[i]], and is required iff bit i of required_mask is set."""
+    __slots__ = ('name', 'type', 'command_field', 'names', 'types', 'required_mask')
+
+    def __init__(self, name: str, type: Type, command_field: int,
+                 names: Tuple[str, ...], types: bytes, required_mask: int):
+        self._set(name=name, type=type, command_field=command_field,
+                  names=names, types=types, required_mask=required_mask)
 
-MESSAGES = [
+def message(name: str, type: Type, command_field: int,
+            fields: Tuple[Field, ...]) -> Message:
+    """Create a Message from a list of Fields."""
+    required_mask = 0
+    for i, f in enumerate(fields):
+        required_mask |= f.required << i
+    return Message(name, type, command_field,
+                   tuple(f.name for f in fields),
+                   bytes(TYPE_CODES[f.type] for f in fields),
+                   required_mask)
+
+MESSAGES = (
     # P3.7 9.3.1.1
-    Message('C_STORE_RQ',
+    message('C_STORE_RQ',
             Type.REQUEST, 1,
-            [Field('AffectedSOPClassUID', 'string', True),
+            (Field('AffectedSOPClassUID', 'string', True),
              Field('MessageID', 'uint16', True),
              Field('Priority', 'uint16', True),
              Field('CommandDataSetType', 'uint16', True),
              Field('AffectedSOPInstanceUID', 'string', True),
 	     Field('MoveOriginatorApplicationEntityTitle', 'string', False),
-	     Field('MoveOriginatorMessageID', 'uint16', False)]),
+	     Field('MoveOriginatorMessageID', 'uint16', False))),
     # P3.7 9.3.1.2
-    Message('C_STORE_RSP',
+    message('C_STORE_RSP',
             Type.RESPONSE, 0x8001,
-            [Field('AffectedSOPClassUID', 'string', True),
+            (Field('AffectedSOPClassUID', 'string', True),
              Field('MessageIDBeingRespondedTo', 'uint16', True),
              Field('CommandDataSetType', 'uint16', True),
              Field('AffectedSOPInstanceUID', 'string', True),
-	     Field('Status', 'Status', True)]),
+	     Field('Status', 'Status', True))),
     # P3.7 9.1.2.1
-    Message('C_FIND_RQ',
+    message('C_FIND_RQ',
             Type.REQUEST, 0x20,
-            [Field('AffectedSOPClassUID', 'string', True),
+            (Field('AffectedSOPClassUID', 'string', True),
              Field('MessageID', 'uint16', True),
              Field('Priority', 'uint16', True),
-             Field('CommandDataSetType', 'uint16', True)]),
-    Message('C_FIND_RSP',
+             Field('CommandDataSetType', 'uint16', True))),
+    message('C_FIND_RSP',
             Type.RESPONSE, 0x8020,
-            [Field('AffectedSOPClassUID', 'string', True),
+            (Field('AffectedSOPClassUID', 'string', True),
              Field('MessageIDBeingRespondedTo', 'uint16', True),
              Field('CommandDataSetType', 'uint16', True),
-	     Field('Status', 'Status', True)]),
+	     Field('Status', 'Status', True))),
     # P3.7 9.1.2.1
-    Message('C_GET_RQ',
+    message('C_GET_RQ',
             Type.REQUEST, 0x10,
-            [Field('AffectedSOPClassUID', 'string', True),
+            (Field('AffectedSOPClassUID', 'string', True),
              Field('MessageID', 'uint16', True),
              Field('Priority', 'uint16', True),
-             Field('CommandDataSetType', 'uint16', True)]),
-    Message('C_GET_RSP',
+             Field('CommandDataSetType', 'uint16', True))),
+    message('C_GET_RSP',
             Type.RESPONSE, 0x8010,
-            [Field('AffectedSOPClassUID', 'string', True),
+            (Field('AffectedSOPClassUID', 'string', True),
              Field('MessageIDBeingRespondedTo', 'uint16', True),
              Field('CommandDataSetType', 'uint16', True),
              Field('NumberOfRemainingSuboperations', 'uint16', False),
              Field('NumberOfCompletedSuboperations', 'uint16', False),
              Field('NumberOfFailedSuboperations', 'uint16', False),
              Field('NumberOfWarningSuboperations', 'uint16', False),
-	     Field('Status', 'Status', True)]),
+	     Field('Status', 'Status', True))),
     # P3.7 9.3.4.1
-    Message('C_MOVE_RQ',
+    message('C_MOVE_RQ',
             Type.REQUEST, 0x21,
-            [Field('AffectedSOPClassUID', 'string', True),
+            (Field('AffectedSOPClassUID', 'string', True),
              Field('MessageID', 'uint16', True),
              Field('Priority', 'uint16', True),
              Field('MoveDestination', 'string', True),
-             Field('CommandDataSetType', 'uint16', True)]),
-    Message('C_MOVE_RSP',
+             Field('CommandDataSetType', 'uint16', True))),
+    message('C_MOVE_RSP',
             Type.RESPONSE, 0x8021,
-            [Field('AffectedSOPClassUID', 'string', True),
+            (Field('AffectedSOPClassUID', 'string', True),
              Field('MessageIDBeingRespondedTo', 'uint16', True),
              Field('CommandDataSetType', 'uint16', True),
              Field('NumberOfRemainingSuboperations', 'uint16', False),
              Field('NumberOfCompletedSuboperations', 'uint16', False),
              Field('NumberOfFailedSuboperations', 'uint16', False),
              Field('NumberOfWarningSuboperations', 'uint16', False),
-	     Field('Status', 'Status', True)]),
+	     Field('Status', 'Status', True))),
     # P3.7 9.3.5
-    Message('C_ECHO_RQ',
+    message('C_ECHO_RQ',
             Type.REQUEST, 0x30,
-            [Field('MessageID', 'uint16', True),
-             Field('CommandDataSetType', 'uint16', True)]),
-    Message('C_ECHO_RSP',
+            (Field('MessageID', 'uint16', True),
+             Field('CommandDataSetType', 'uint16', True))),
+    message('C_ECHO_RSP',
             Type.RESPONSE, 0x8030,
-            [Field('MessageIDBeingRespondedTo', 'uint16', True),
+            (Field('MessageIDBeingRespondedTo', 'uint16', True),
              Field('CommandDataSetType', 'uint16', True),
-	     Field('Status', 'Status', True)])
-]
-
-def generate_go_definition(m: Message, out: IO[str]):
-    print(f'type {m.name} struct  {{', file=out)
-    for f in m.fields:
-        print(f'	{f.name} {f.type}', file=out)
-    print(f'	Extra []*dicom.Element  // Unparsed elements', file=out)
-    print('}', file=out)
-
-    print('', file=out)
-    print(f'func (v* {m.name}) Encode(e *dicomio.Encoder) {{', file=out)
-    print(f'	encodeField(e, dicom.TagCommandField, uint16({m.command_field}))', file=out)
-    for f in m.fields:
-        if not f.required:
-            if f.type == 'string':
-                zero = '""'
-            else:
-                zero = '0'
-            print(f'	if v.{f.name} != {zero} {{', file=out)
-            print(f'		encodeField(e, dicom.Tag{f.name}, v.{f.name})', file=out)
-            print(f'	}}', file=out)
-        elif f.type == 'Status':
-            print(f'	encodeStatus(e, v.{f.name})', file=out)
-        else:
-            print(f'	encodeField(e, dicom.Tag{f.name}, v.{f.name})', file=out)
-    print('	for _, elem := range v.Extra {', file=out)
-    print('		dicom.WriteElement(e, elem)', file=out)
-    print('	}', file=out)
-    print('}', file=out)
-
-    print('', file=out)
-    print(f'func (v* {m.name}) HasData() bool {{', file=out)
-    print(f'	return v.CommandDataSetType != CommandDataSetTypeNull', file=out)
-    print('}', file=out)
-
-    print('', file=out)
-    print(f'func (v* {m.name}) CommandField() int {{', file=out)
-    print(f'	return {m.command_field}', file=out)
-    print('}', file=out)
-
-    print('', file=out)
-    print(f'func (v* {m.name}) GetMessageID() uint16 {{', file=out)
+	     Field('Status', 'Status', True))))
+
+# Go field type -> the fieldKind constant that describes it in a message schema.
+FIELD_KINDS = {'string': 'fieldKindString', 'uint16': 'fieldKindUInt16',
+               'uint32': 'fieldKindUInt32', 'Status': 'fieldKindStatus'}
+
+# Go field type -> the Go function that encodes it. Integers are written
+# directly; strings go through dicom.WriteElement, which knows each VR's padding.
+ENCODERS = {'string': 'encodeField', 'uint16': 'encodeUInt16Field', 'uint32': 'encodeUInt32Field'}
+
+# Check the tables once at load time so that render_field can index them
+# without error handling. Status fields have their own encode helper.
+if not all(typ in FIELD_KINDS and (typ == 'Status' or typ in ENCODERS) for typ in TYPES):
+    raise Exception(f'TYPES {TYPES} not covered by FIELD_KINDS and ENCODERS')
+
+# Encode statement for a field, keyed by (required, Go type); '*' matches any
+# type without its own entry. %-formatted with {'name': field name, 'encoder':
+# ENCODERS[type]}.
+ENCODE_TEMPLATES = {
+    (True, 'Status'): '\tencodeStatus(e, v.%(name)s)\n',
+    (True, '*'): '\t%(encoder)s(e, dicom.Tag%(name)s, v.%(name)s)\n',
+    (False, 'string'): """\tif v.%(name)s != "" {
+\t\t%(encoder)s(e, dicom.Tag%(name)s, v.%(name)s)
+\t}
+""",
+    (False, '*'): """\tif v.%(name)s != 0 {
+\t\t%(encoder)s(e, dicom.Tag%(name)s, v.%(name)s)
+\t}
+""",
+}
+
+# Bytes needed to encode a field of each Go type as an implicit-VR element: 8
+# for the tag and length, plus the value. Strings assume the 64-byte maximum
+# length of a UID; Status assumes no ErrorComment.
+ENCODED_SIZES = {'string': 8 + 64, 'uint16': 8 + 2, 'uint32': 8 + 4, 'Status': 8 + 2}
+
+@functools.lru_cache(maxsize=None)
+def render_field(name: str, typ: str, req: int) -> Tuple[str, str]:
+    """Return the Encode statement and the schema entry for a field. Memoized,
+    so each distinct field is rendered once no matter how many messages
+    contain it."""
+    template = ENCODE_TEMPLATES.get((req, typ)) or ENCODE_TEMPLATES[req, '*']
+    values = {'name': name}
+    if typ != 'Status':
+        values['encoder'] = ENCODERS[typ]
+    encode = template % values
+
+    required = ('OptionalElement', 'RequiredElement')[req]
+    spec = f'\t{{"{name}", dicom.Tag{name}, {FIELD_KINDS[typ]}, {required}}},\n'
+    return encode, spec
+
+# Go source of one message type. str.format_map'ed by render_skeleton.
+MESSAGE_TEMPLATE = """type {type_name} struct  {{
+{struct_body}\tExtra []*dicom.Element  // Unparsed elements
+}}
+
+func (v* {type_name}) Encode(e *dicomio.Encoder) {{
+\tencodeUInt16Field(e, dicom.TagCommandField, {command_field})
+{encode_body}\tfor _, elem := range v.Extra {{
+\t\tdicom.WriteElement(e, elem)
+\t}}
+}}
+
+func (v* {type_name}) HasData() bool {{
+\treturn v.CommandDataSetType != CommandDataSetTypeNull
+}}
+
+func (v* {type_name}) CommandField() int {{
+\treturn {command_field}
+}}
+
+func (v* {type_name}) GetMessageID() uint16 {{
+\treturn v.{message_id}
+}}
+
+func (v* {type_name}) encodedSizeHint() int {{
+\treturn {size_hint}
+}}
+
+var schema{type_name} = []fieldSpec{{
+{schema_body}}}
+
+func (v* {type_name}) String() string {{
+\treturn formatMessage("{type_name}", v, schema{type_name})
+}}
+
+func decode{type_name}(d *messageDecoder) *{type_name} {{
+\tv := &{type_name}{{}}
+\tdecodeMessage(d, v, schema{type_name})
+\treturn v
+}}
+"""
+
+@functools.lru_cache(maxsize=None)
+def render_skeleton(names: Tuple[str, ...], types: bytes, required_mask: int) -> str:
+    """Return the Go source for a message with the given fields, as a
+    %-template over 'type_name', 'command_field' and 'message_id'.
+
+    Messages with the same fields, e.g., C_FIND_RQ and C_GET_RQ, share one
+    skeleton."""
+    struct_body = []
+    rendered = []
+    for i, name in enumerate(names):
+        typ = TYPES[types[i]]
+        struct_body.append(f'\t{name} {typ}\n')
+        rendered.append(render_field(name, typ, (required_mask >> i) & 1))
+    # The CommandField element is a uint16.
+    size_hint = ENCODED_SIZES['uint16'] + sum(ENCODED_SIZES[TYPES[code]] for code in types)
+    return MESSAGE_TEMPLATE.format_map({
+        'type_name': '%(type_name)s',
+        'command_field': '%(command_field)d',
+        'message_id': '%(message_id)s',
+        'struct_body': ''.join(struct_body),
+        'encode_body': ''.join(encode for encode, _ in rendered),
+        'schema_body': ''.join(spec for _, spec in rendered),
+        'size_hint': size_hint,
+    })
+
+def generate_go_definition(m: Message) -> str:
     if m.type == Type.REQUEST:
-        print(f'	return v.MessageID', file=out)
+        message_id = 'MessageID'
     else:
-        print(f'	return v.MessageIDBeingRespondedTo', file=out)
-    print('}', file=out)
-
-    print('', file=out)
-    print(f'func (v* {m.name}) String() string {{', file=out)
-    i = 0
-    fmt = f'{m.name}{{'
-    args = ''
-    for f in m.fields:
-        space = ''
-        if i > 0:
-            fmt += ' '
-            args += ', '
-        fmt += f'{f.name}:%v'
-        args += f'v.{f.name}'
-        i += 1
-    fmt += "}}"
-    print(f'	return fmt.Sprintf("{fmt}", {args})', file=out)
-    print('}', file=out)
-
-
-    print('', file=out)
-    print(f'func decode{m.name}(d *messageDecoder) *{m.name} {{', file=out)
-    print(f'	v := &{m.name}{{}}', file=out)
-    for f in m.fields:
-        if f.type == 'Status':
-            print(f'	v.{f.name} = d.getStatus()', file=out)
-        else:
-            if f.type == 'string':
-                decoder = 'String'
-            elif f.type == 'uint16':
-                decoder = 'UInt16'
-            elif f.type == 'uint32':
-                decoder = 'UInt32'
-            else:
-                raise Exception(f)
-            if f.required:
-                required = 'RequiredElement'
-            else:
-                required = 'OptionalElement'
-            print(f'	v.{f.name} = d.get{decoder}(dicom.Tag{f.name}, {required})', file=out)
-    print(f'	v.Extra = d.unparsedElements()', file=out)
-    print(f'	return v', file=out)
-    print('}', file=out)
+        message_id = 'MessageIDBeingRespondedTo'
+    skeleton = render_skeleton(m.names, m.types, m.required_mask)
+    return skeleton % {'type_name': m.name,
+                       'command_field': m.command_field,
+                       'message_id': message_id}
 
-def main():
-    with open('dimse_messages.go', 'w') as out:
-        print("""
+def write_file(path: str, *chunks: bytes):
+    """Write "chunks" to "path" directly through the fd, bypassing the
+    text-mode encoder and buffering layers."""
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        for chunk in chunks:
+            view = memoryview(chunk)
+            while view:
+                view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+
+def find_perfect_hash(keys: List[int]) -> Tuple[int, int]:
+    """Return (shift, size) such that (k ^ (k >> shift)) & (size - 1) differs
+    for every key, with the smallest power-of-two size possible.
+
+    x ^ (x >> shift) is a bijection on uint16, so the search always ends by
+    size 0x10000."""
+    size = 1
+    while size < len(keys):
+        size *= 2
+    while True:
+        for shift in range(1, 16):
+            if len({(k ^ (k >> shift)) & (size - 1) for k in keys}) == len(keys):
+                return shift, size
+        size *= 2
+
+OUTPUT_PATH = 'dimse_messages.go'
+
+# Preamble of the generated file, following the hash line.
+HEADER = b"""
 // Auto-generated from generate_dimse_messages.py. DO NOT EDIT.
 package dimse
 import (
 	"github.com/yasushi-saito/go-dicom"
 	"github.com/yasushi-saito/go-dicom/dicomio"
-        "fmt"
+	"fmt"
 )
-        """, file=out)
-        for m in MESSAGES:
-            generate_go_definition(m, out)
-
-        for m in MESSAGES:
-            print(f'const CommandField{m.name} = {m.command_field}', file=out)
-
-        print('func decodeMessageForType(d* messageDecoder, commandField uint16) Message {', file=out)
-        print('	switch commandField {', file=out)
-        for m in MESSAGES:
-            print('	case 0x%x:' % (m.command_field, ), file=out)
-            print(f'		return decode{m.name}(d)', file=out)
-        print('	default:', file=out)
-        print('		d.setError(fmt.Errorf("Unknown DIMSE command 0x%x", commandField))', file=out)
-        print('		return nil', file=out)
-        print('	}', file=out)
-        print('}', file=out)
-
-main()
+
+"""
+
+def source_hash() -> str:
+    """Return a hash of this script. It covers both MESSAGES and the templates,
+    so any edit that can change the output changes the hash."""
+    with open(__file__, 'rb') as f:
+        return hashlib.blake2b(f.read(), digest_size=8).hexdigest()
+
+def read_first_line(path: str) -> str:
+    """Return the first line of "path", or '' if it does not exist."""
+    try:
+        with open(path) as f:
+            return f.readline()
+    except FileNotFoundError:
+        return ''
+
+def main():
+    # Skip regeneration when the output was generated by this exact script, so
+    # its mtime is left alone and Go does not rebuild the package.
+    hash_line = f'// hash: {source_hash()}\n'
+    if read_first_line(OUTPUT_PATH) == hash_line:
+        return
+
+    parts = [generate_go_definition(m) for m in MESSAGES]
+
+    for m in MESSAGES:
+        parts.append(f'const CommandField{m.name} = {m.command_field}\n')
+
+    shift, size = find_perfect_hash([m.command_field for m in MESSAGES])
+    slots = sorted(((m.command_field ^ (m.command_field >> shift)) & (size - 1), m)
+                   for m in MESSAGES)
+    parts.append(f"""type messageDecoderEntry struct {{
+\tcommandField uint16
+\tdecode       func(*messageDecoder) Message
+}}
+
+// Indexed by commandFieldSlot(commandField).
+var messageDecoders = [{size}]messageDecoderEntry{{
+""")
+    for slot, m in slots:
+        parts.append('\t%d: {0x%x, func(d *messageDecoder) Message { return decode%s(d) }},\n' %
+                     (slot, m.command_field, m.name))
+    parts.append(f"""}}
+
+// Perfect hash of the command fields of all message types, found by
+// generate_dimse_messages.py.
+func commandFieldSlot(commandField uint16) uint16 {{
+\treturn (commandField ^ (commandField >> {shift})) & {size - 1}
+}}
+
+func decodeMessageForType(d* messageDecoder, commandField uint16) Message {{
+\tentry := &messageDecoders[commandFieldSlot(commandField)]
+\tif entry.decode == nil || entry.commandField != commandField {{
+\t\td.setError(fmt.Errorf("Unknown DIMSE command 0x%x", commandField))
+\t\treturn nil
+\t}}
+\treturn entry.decode(d)
+}}
+""")
+    write_file(OUTPUT_PATH, hash_line.encode('ascii'), HEADER,
+               ''.join(parts).encode('ascii'))
+
+if __name__ == '__main__':
+    main()
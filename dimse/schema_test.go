@@ -0,0 +1,50 @@
+package dimse
+
+import (
+	"reflect"
+	"testing"
+)
+
+// decodeMessage and formatMessage access struct fields by schema index, so each
+// message struct must have exactly its schema's fields followed by Extra.
+func TestSchemaMatchesStruct(t *testing.T) {
+	schemas := []struct {
+		v      Message
+		schema []fieldSpec
+	}{
+		{&C_STORE_RQ{}, schemaC_STORE_RQ},
+		{&C_STORE_RSP{}, schemaC_STORE_RSP},
+		{&C_FIND_RQ{}, schemaC_FIND_RQ},
+		{&C_FIND_RSP{}, schemaC_FIND_RSP},
+		{&C_GET_RQ{}, schemaC_GET_RQ},
+		{&C_GET_RSP{}, schemaC_GET_RSP},
+		{&C_MOVE_RQ{}, schemaC_MOVE_RQ},
+		{&C_MOVE_RSP{}, schemaC_MOVE_RSP},
+		{&C_ECHO_RQ{}, schemaC_ECHO_RQ},
+		{&C_ECHO_RSP{}, schemaC_ECHO_RSP},
+	}
+	n := 0
+	for _, entry := range messageDecoders {
+		if entry.decode != nil {
+			n++
+		}
+	}
+	if n != len(schemas) {
+		t.Errorf("Found %d message types, but only %d are checked", n, len(schemas))
+	}
+	for _, s := range schemas {
+		rt := reflect.TypeOf(s.v).Elem()
+		if rt.NumField() != len(s.schema)+1 {
+			t.Errorf("%v: %d fields, schema has %d (+Extra)", rt, rt.NumField(), len(s.schema))
+			continue
+		}
+		for i, f := range s.schema {
+			if name := rt.Field(i).Name; name != f.name {
+				t.Errorf("%v: field %d is %s, schema says %s", rt, i, name, f.name)
+			}
+		}
+		if name := rt.Field(len(s.schema)).Name; name != "Extra" {
+			t.Errorf("%v: last field is %s, expect Extra", rt, name)
+		}
+	}
+}